@@ -1,75 +1,114 @@
 import os
 from dotenv import load_dotenv
+from functools import cached_property, lru_cache
 from pathlib import Path
-from urllib.parse import quote_plus
+from typing import Optional, Tuple
+from urllib.parse import quote_plus, urlunsplit
 
 # 프로젝트 디렉토리 기준 .env 파일 로드
 basedir = Path(__file__).resolve().parent.parent.parent
 dotenv_path = basedir / '.env'
-print(f"Loading .env file from: {dotenv_path}")
 load_dotenv(dotenv_path)
 
+# 환경 변수는 .env 로드 직후 한 번만 읽어 캐싱합니다.
+_ENV = dict(os.environ)
+_get = _ENV.get
+
 def get_env_variable(name: str) -> str:
-    value = os.getenv(name)
+    value = _get(name)
     if not value:
         raise ValueError(f"환경 변수 '{name}'가 설정되지 않았습니다.")
     return value
 
 class Config:
-    """기본 설정"""
-    ENV = os.getenv('FASTAPI_ENV', 'production')
-    print(f"ENV: {ENV}")
-    DEBUG = os.getenv('FASTAPI_DEBUG', 'False').lower() in ['true', '1', 't']
-    TESTING = os.getenv('FASTAPI_TESTING', 'False').lower() in ['true', '1', 't']
-    SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key')
+    """기본 설정 (환경별 설정 클래스마다 인스턴스는 하나만 생성됩니다)"""
+    _instance: Optional["Config"] = None
+    # DB 접속 정보 환경 변수 접두사 (예: 'DEV' -> DEV_DB_USERNAME)
+    _PREFIX: Optional[str] = None
+
+    ENV = _get('FASTAPI_ENV', 'production')
+    DEBUG = _get('FASTAPI_DEBUG', 'False').lower() in ['true', '1', 't']
+    TESTING = _get('FASTAPI_TESTING', 'False').lower() in ['true', '1', 't']
+    SECRET_KEY = _get('SECRET_KEY', 'your-secret-key')
 
     # 모델 설정 (로컬 LLM 사용 여부에 따라 모델 선택)
-    USE_LOCAL_LLM = os.getenv('USE_LOCAL_LLM', 'False').lower() in ['true', '1', 't']
+    USE_LOCAL_LLM = _get('USE_LOCAL_LLM', 'False').lower() in ['true', '1', 't']
     if USE_LOCAL_LLM:
         OPENAI_MODEL_NM = 'local-llm-model'
     else:
-        OPENAI_MODEL_NM = os.getenv('OPENAI_MODEL_NM', 'gpt-4o-mini')
-    OPENAI_MODEL_4O = os.getenv('OPENAI_MODEL_4O', 'gpt-4o')
-
-    # 데이터베이스 기본 설정
-    DATABASE_URL = "sqlite:///:memory:"  # 기본값 설정
-    ASYNC_DATABASE_URL = "sqlite+aiosqlite:///:memory:"  # 기본값 설정
+        OPENAI_MODEL_NM = _get('OPENAI_MODEL_NM', 'gpt-4o-mini')
+    OPENAI_MODEL_4O = _get('OPENAI_MODEL_4O', 'gpt-4o')
 
     # OpenAI API 설정
     OPENAI_API_KEY = get_env_variable('OPENAI_API_KEY')
 
     # CORS 설정
-    CORS_ORIGINS = os.getenv('CORS_ORIGINS', '*')
+    CORS_ORIGINS = _get('CORS_ORIGINS', '*')
 
     # 외부 API 설정
-    FETCH_COUNT_LIMIT = int(os.getenv("FETCH_COUNT_LIMIT", 10))
+    FETCH_COUNT_LIMIT = int(_get("FETCH_COUNT_LIMIT", 10))
 
     # 기타 설정
-    SOME_OTHER_CONFIG = os.getenv('SOME_OTHER_CONFIG', 'default_value')
+    SOME_OTHER_CONFIG = _get('SOME_OTHER_CONFIG', 'default_value')
+
+    def __new__(cls) -> "Config":
+        # 서브클래스가 부모의 인스턴스를 물려받지 않도록 클래스 자신의 속성만 확인
+        instance = cls.__dict__.get('_instance')
+        if instance is None:
+            instance = super().__new__(cls)
+            cls._instance = instance
+        return instance
+
+    @classmethod
+    def instance(cls) -> "Config":
+        """FASTAPI_ENV에 해당하는 설정 인스턴스를 반환합니다."""
+        return get_config(_get('FASTAPI_ENV', 'dev'))
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _db_creds(prefix: str) -> Tuple[str, str, str, str, str]:
+        """접두사별 DB 접속 정보를 한 번만 읽고, 비밀번호는 URL 인코딩해 둡니다."""
+        username, password, host, port, database = (
+            get_env_variable(f'{prefix}_DB_{key}') for key in ('USERNAME', 'PASSWORD', 'HOST', 'PORT', 'DATABASE')
+        )
+        return username, quote_plus(password), host, port, database
+
+    @classmethod
+    def _build_url(cls, driver: str, prefix: str) -> str:
+        """동기/비동기 URL이 같은 접속 정보를 공유하도록 드라이버만 바꿔 URL을 만듭니다."""
+        username, password, host, port, database = cls._db_creds(prefix)
+        return urlunsplit((f'mysql+{driver}', f'{username}:{password}@{host}:{port}', f'/{database}', '', ''))
+
+    # 데이터베이스 설정 (접두사가 없으면 기본값 사용)
+    @cached_property
+    def DATABASE_URL(self) -> str:
+        if self._PREFIX is None:
+            return "sqlite:///:memory:"
+        return self._build_url('pymysql', self._PREFIX)
+
+    @cached_property
+    def ASYNC_DATABASE_URL(self) -> str:
+        if self._PREFIX is None:
+            return "sqlite+aiosqlite:///:memory:"
+        return self._build_url('aiomysql', self._PREFIX)
 
 class DevelopmentConfig(Config):
     """개발 환경 설정"""
     DEBUG = True
-    ASYNC_DATABASE_URL = f"mysql+aiomysql://{get_env_variable('DEV_DB_USERNAME')}:{quote_plus(get_env_variable('DEV_DB_PASSWORD'))}@{get_env_variable('DEV_DB_HOST')}:{get_env_variable('DEV_DB_PORT')}/{get_env_variable('DEV_DB_DATABASE')}"
-    DATABASE_URL = f"mysql+pymysql://{get_env_variable('DEV_DB_USERNAME')}:{quote_plus(get_env_variable('DEV_DB_PASSWORD'))}@{get_env_variable('DEV_DB_HOST')}:{get_env_variable('DEV_DB_PORT')}/{get_env_variable('DEV_DB_DATABASE')}"
-    print(f"DevelopmentConfig DATABASE_URL: {DATABASE_URL}")
+    _PREFIX = 'DEV'
 
 class TestingConfig(Config):
     """테스트 환경 설정"""
     TESTING = True
-    ASYNC_DATABASE_URL = f"mysql+aiomysql://{get_env_variable('TEST_DB_USERNAME')}:{quote_plus(get_env_variable('TEST_DB_PASSWORD'))}@{get_env_variable('TEST_DB_HOST')}:{get_env_variable('TEST_DB_PORT')}/{get_env_variable('TEST_DB_DATABASE')}"
-    DATABASE_URL = f"mysql+pymysql://{get_env_variable('TEST_DB_USERNAME')}:{quote_plus(get_env_variable('TEST_DB_PASSWORD'))}@{get_env_variable('TEST_DB_HOST')}:{get_env_variable('TEST_DB_PORT')}/{get_env_variable('TEST_DB_DATABASE')}"
-    print(f"TestingConfig DATABASE_URL: {DATABASE_URL}")
+    _PREFIX = 'TEST'
 
 class ProductionConfig(Config):
     """운영 환경 설정"""
     DEBUG = False
-    ASYNC_DATABASE_URL = f"mysql+aiomysql://{get_env_variable('PROD_DB_USERNAME')}:{quote_plus(get_env_variable('PROD_DB_PASSWORD'))}@{get_env_variable('PROD_DB_HOST')}:{get_env_variable('PROD_DB_PORT')}/{get_env_variable('PROD_DB_DATABASE')}"
-    DATABASE_URL = f"mysql+pymysql://{get_env_variable('PROD_DB_USERNAME')}:{quote_plus(get_env_variable('PROD_DB_PASSWORD'))}@{get_env_variable('PROD_DB_HOST')}:{get_env_variable('PROD_DB_PORT')}/{get_env_variable('PROD_DB_DATABASE')}"
-    print(f"ProductionConfig DATABASE_URL: {DATABASE_URL}")
+    _PREFIX = 'PROD'
 
-# 환경 변수에 따라 적절한 설정 클래스를 반환
-def get_config(env: str):
+# 환경 변수에 따라 적절한 설정 클래스를 반환 (싱글톤이므로 항상 같은 인스턴스)
+def get_config(env: str) -> Config:
     if env == 'dev':
         return DevelopmentConfig()
     elif env == 'test':
@@ -78,9 +117,12 @@ def get_config(env: str):
         return ProductionConfig()
     return Config()
 
-current_env = os.getenv('FASTAPI_ENV', 'dev')
-print(f"Current FASTAPI_ENV: {current_env}")
-current_config = get_config(current_env)
-print(f"Current Config DATABASE_URL: {current_config.DATABASE_URL}")
-print(f"Current Config ASYNC_DATABASE_URL: {current_config.ASYNC_DATABASE_URL}")
-print(f"Current Config Model Name: {current_config.OPENAI_MODEL_NM}")
+current_env = _get('FASTAPI_ENV', 'dev')
+current_config = Config.instance()
+
+if current_config.DEBUG:
+    print(f"Loading .env file from: {dotenv_path}")
+    print(f"Current FASTAPI_ENV: {current_env}")
+    print(f"Current Config DATABASE_URL: {current_config.DATABASE_URL}")
+    print(f"Current Config ASYNC_DATABASE_URL: {current_config.ASYNC_DATABASE_URL}")
+    print(f"Current Config Model Name: {current_config.OPENAI_MODEL_NM}")
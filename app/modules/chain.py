@@ -1,48 +1,81 @@
+import asyncio
+from functools import lru_cache
 from openai_client import ChatOpenAI
 from sql_memory import SQLChatMemory, HumanMessage, AIMessage
 from prompt_template import ChatPromptTemplate
 from app.core.config import current_config  # 환경 설정을 가져옵니다.
 
-# SQLChatMemory 인스턴스 생성
-chat_memory = SQLChatMemory(db_url=current_config.DATABASE_URL)
-
-# 모델 생성
-llm = ChatOpenAI(
-    model_name=current_config.OPENAI_MODEL_NM,
-    temperature=0.7,
-    max_tokens=8192,
-    api_key=current_config.OPENAI_API_KEY
-)
-question = "담배를 맛있게 피는 법"
-# 프롬프트 템플릿 생성
-template = ChatPromptTemplate(
-    messages=[
-        ("system", "You are a helpful assistant. answer in {country} "),
-        ("user", question),
-    ],
-    memory=chat_memory
-)
-
-# 예제 데이터
-user_id = "user123"
-orgn_id = "org456"
-session_id = "session789"
-
-# 프롬프트 생성
-formatted_messages = template.format_messages(
-    user_id=user_id,
-    orgn_id=orgn_id,
-    session_id=session_id,
-    country="japanese",
-)
-
-# OpenAI API를 호출하여 응답 생성
-response = llm.generate_response(formatted_messages)
-human_message = HumanMessage(question)
-chat_memory.add_message(human_message, user_id=user_id, orgn_id=orgn_id, session_id=session_id)
-# 응답을 메시지로 저장
-ai_message = AIMessage(response)
-chat_memory.add_message(ai_message, user_id=user_id, orgn_id=orgn_id, session_id=session_id)
-
-# 출력
-print(response)
+
+@lru_cache(maxsize=None)
+def get_chat_memory() -> SQLChatMemory:
+    """SQLChatMemory 인스턴스를 처음 호출할 때 생성합니다."""
+    # 첫 요청 지연을 피하기 위해 토크나이저를 미리 로드
+    SQLChatMemory.warmup()
+    # 비동기 메서드는 aiomysql 커넥션 풀로 직접 실행
+    return SQLChatMemory(
+        db_url=current_config.DATABASE_URL,
+        async_db_url=current_config.ASYNC_DATABASE_URL,
+        use_orm=False
+    )
+
+
+@lru_cache(maxsize=None)
+def get_llm() -> ChatOpenAI:
+    """모델을 처음 호출할 때 생성합니다."""
+    return ChatOpenAI(
+        model_name=current_config.OPENAI_MODEL_NM,
+        temperature=0.7,
+        api_key=current_config.OPENAI_API_KEY
+    )
+
+
+@lru_cache(maxsize=None)
+def get_template() -> ChatPromptTemplate:
+    """프롬프트 템플릿을 처음 호출할 때 생성합니다."""
+    return ChatPromptTemplate(
+        messages=[
+            ("system", "You are a helpful assistant. answer in {country} "),
+            ("user", "{question}"),
+        ],
+        memory=get_chat_memory()
+    )
+
+
+async def _demo() -> None:
+    chat_memory = get_chat_memory()
+    llm = get_llm()
+    template = get_template()
+
+    question = "담배를 맛있게 피는 법"
+
+    # 예제 데이터
+    user_id = "user123"
+    orgn_id = "org456"
+    session_id = "session789"
+
+    # 프롬프트 생성 (응답 길이에 맞춘 max_tokens 추정치 포함)
+    formatted_messages, max_tokens_hint = template.format_messages_with_hint(
+        user_id=user_id,
+        orgn_id=orgn_id,
+        session_id=session_id,
+        country="japanese",
+        question=question,
+    )
+
+    # OpenAI API 호출과 질문 저장을 동시에 진행
+    human_message = HumanMessage(question)
+    response, _ = await asyncio.gather(
+        llm.async_generate_response(formatted_messages, max_tokens=max_tokens_hint),
+        chat_memory.aadd_message(human_message, user_id=user_id, orgn_id=orgn_id, session_id=session_id),
+    )
+    # 응답을 메시지로 저장
+    ai_message = AIMessage(response)
+    await chat_memory.aadd_message(ai_message, user_id=user_id, orgn_id=orgn_id, session_id=session_id)
+
+    # 출력
+    print(response)
+    await chat_memory.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(_demo())
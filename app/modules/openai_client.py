@@ -1,8 +1,25 @@
 import os
 import asyncio
-from openai import OpenAI, AsyncOpenAI
+import httpx
+from functools import cached_property, lru_cache
+from openai import OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient
 from typing import Optional, Dict, Any, List, Generator, AsyncGenerator
 
+# 모든 ChatOpenAI 인스턴스가 공유하는 HTTP 커넥션 풀 설정
+_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32)
+
+
+@lru_cache(maxsize=None)
+def _shared_http_client() -> httpx.Client:
+    """동기 클라이언트들이 공유하는 httpx.Client를 반환합니다. (OpenAI 기본 타임아웃 유지)"""
+    return DefaultHttpxClient(limits=_HTTP_LIMITS)
+
+
+@lru_cache(maxsize=None)
+def _shared_async_http_client() -> httpx.AsyncClient:
+    """비동기 클라이언트들이 공유하는 httpx.AsyncClient를 반환합니다. (OpenAI 기본 타임아웃 유지)"""
+    return DefaultAsyncHttpxClient(limits=_HTTP_LIMITS)
+
 
 class ChatOpenAI:
     """
@@ -33,15 +50,22 @@ class ChatOpenAI:
                 "API key is required. Set it via the 'api_key' argument or the 'OPENAI_API_KEY' environment variable."
             )
 
-        # 동기 및 비동기 OpenAI 클라이언트 초기화
-        self.client = OpenAI(api_key=self.api_key, base_url=base_url)
-        self.async_client = AsyncOpenAI(api_key=self.api_key, base_url=base_url)
         self.model_name = model_name
         self.temperature = temperature
         self.max_tokens = max_tokens
         self.base_url = base_url
         self.extra_kwargs = kwargs
 
+    @cached_property
+    def client(self) -> OpenAI:
+        """동기 OpenAI 클라이언트 (처음 사용할 때 생성)."""
+        return OpenAI(api_key=self.api_key, base_url=self.base_url, http_client=_shared_http_client())
+
+    @cached_property
+    def async_client(self) -> AsyncOpenAI:
+        """비동기 OpenAI 클라이언트 (처음 사용할 때 생성)."""
+        return AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, http_client=_shared_async_http_client())
+
     def __repr__(self) -> str:
         return (
             f"ChatOpenAI(model={self.model_name}, temperature={self.temperature}, "
@@ -49,12 +73,13 @@ class ChatOpenAI:
             f"base_url={self.base_url}, extra_kwargs={self.extra_kwargs})"
         )
 
-    def generate_response(self, messages: List[Dict[str, str]]) -> str:
+    def generate_response(self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None) -> str:
         """
         대화 메시지 목록을 받아 모델의 응답을 생성합니다.
 
         Args:
             messages (List[Dict[str, str]]): 대화 메시지 목록.
+            max_tokens (Optional[int]): 이번 호출에만 적용할 최대 토큰 수. 지정하지 않으면 인스턴스 설정을 사용.
 
         Returns:
             str: 모델의 응답 메시지.
@@ -64,47 +89,48 @@ class ChatOpenAI:
                 messages=messages,
                 model=self.model_name,
                 temperature=self.temperature,
-                max_tokens=self.max_tokens,
+                max_tokens=self.max_tokens if max_tokens is None else max_tokens,
                 **self.extra_kwargs
             )
             return chat_completion.choices[0].message.content
         except Exception as e:
             raise RuntimeError(f"Failed to generate response: {e}")
 
-    def stream_response(self, messages: List[Dict[str, str]]) -> Generator[str, None, None]:
+    def stream_response(self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None) -> Generator[str, None, None]:
         """
-        대화 메시지 목록을 받아 스트리밍 방식으로 모델의 응답을 한 글자씩 생성합니다.
+        대화 메시지 목록을 받아 스트리밍 방식으로 모델의 응답을 청크 단위로 생성합니다.
 
         Args:
             messages (List[Dict[str, str]]): 대화 메시지 목록.
+            max_tokens (Optional[int]): 이번 호출에만 적용할 최대 토큰 수. 지정하지 않으면 인스턴스 설정을 사용.
 
         Yields:
-            str: 한 번에 한 글자씩 반환합니다.
+            str: 수신한 응답 청크를 그대로 반환합니다.
         """
         try:
             response = self.client.chat.completions.create(
                 model=self.model_name,
                 messages=messages,
                 temperature=self.temperature,
-                max_tokens=self.max_tokens,
+                max_tokens=self.max_tokens if max_tokens is None else max_tokens,
                 stream=True,
                 **self.extra_kwargs
             )
 
             for chunk in response:
-                if chunk.choices[0].delta.get('content'):
-                    content = chunk.choices[0].delta.content
-                    for char in content:
-                        yield char
+                content = chunk.choices[0].delta.content
+                if content:
+                    yield content
         except Exception as e:
             raise RuntimeError(f"Failed to stream response: {e}")
 
-    async def async_generate_response(self, messages: List[Dict[str, str]]) -> str:
+    async def async_generate_response(self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None) -> str:
         """
         대화 메시지 목록을 비동기적으로 받아 모델의 응답을 생성합니다.
 
         Args:
             messages (List[Dict[str, str]]): 대화 메시지 목록.
+            max_tokens (Optional[int]): 이번 호출에만 적용할 최대 토큰 수. 지정하지 않으면 인스턴스 설정을 사용.
 
         Returns:
             str: 모델의 응답 메시지.
@@ -114,38 +140,38 @@ class ChatOpenAI:
                 messages=messages,
                 model=self.model_name,
                 temperature=self.temperature,
-                max_tokens=self.max_tokens,
+                max_tokens=self.max_tokens if max_tokens is None else max_tokens,
                 **self.extra_kwargs
             )
             return chat_completion.choices[0].message.content
         except Exception as e:
             raise RuntimeError(f"Failed to generate async response: {e}")
 
-    async def async_stream_response(self, messages: List[Dict[str, str]]) -> AsyncGenerator[str, None]:
+    async def async_stream_response(self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None) -> AsyncGenerator[str, None]:
         """
-        대화 메시지 목록을 비동기적으로 받아 스트리밍 방식으로 모델의 응답을 한 글자씩 생성합니다.
+        대화 메시지 목록을 비동기적으로 받아 스트리밍 방식으로 모델의 응답을 청크 단위로 생성합니다.
 
         Args:
             messages (List[Dict[str, str]]): 대화 메시지 목록.
+            max_tokens (Optional[int]): 이번 호출에만 적용할 최대 토큰 수. 지정하지 않으면 인스턴스 설정을 사용.
 
         Yields:
-            str: 한 번에 한 글자씩 반환합니다.
+            str: 수신한 응답 청크를 그대로 반환합니다.
         """
         try:
             response = await self.async_client.chat.completions.create(
                 model=self.model_name,
                 messages=messages,
                 temperature=self.temperature,
-                max_tokens=self.max_tokens,
+                max_tokens=self.max_tokens if max_tokens is None else max_tokens,
                 stream=True,
                 **self.extra_kwargs
             )
 
             async for chunk in response:
-                if chunk.choices[0].delta.get('content'):
-                    content = chunk.choices[0].delta.content
-                    for char in content:
-                        yield char
+                content = chunk.choices[0].delta.content
+                if content:
+                    yield content
         except Exception as e:
             raise RuntimeError(f"Failed to stream async response: {e}")
 
@@ -1,6 +1,23 @@
-from typing import List, Dict, Any, Sequence, Literal, Union, Optional, Tuple, Callable
+import string
+from typing import List, Dict, Any, Sequence, Literal, Union, Optional, Tuple, Callable, FrozenSet
 from sql_memory import ChatHistory, BaseMessage, HumanMessage, AIMessage,SQLChatMemory
 
+_FORMATTER = string.Formatter()
+
+
+def _field_names(template: str) -> FrozenSet[str]:
+    """템플릿이 참조하는 변수 이름을 추출합니다. ('{a.b}', '{a[0]}' -> 'a')"""
+    names = set()
+    for _, field_name, _, _ in _FORMATTER.parse(template):
+        if field_name:
+            names.add(field_name.split('.', 1)[0].split('[', 1)[0])
+    return frozenset(names)
+
+
+def _is_callable_tuple(value: Any) -> bool:
+    """(함수, 인자...) 형태의 동적 값인지 확인합니다."""
+    return isinstance(value, tuple) and bool(value) and callable(value[0])
+
 class ChatPromptTemplate:
     """
     시스템 메시지와 유저 메시지를 포함한 채팅 프롬프트 템플릿 클래스.
@@ -20,6 +37,35 @@ class ChatPromptTemplate:
         self.messages = messages
         self.template_format = template_format
         self.memory = memory
+        # ("plain" | "dyn", role, template) 형태로 미리 파싱
+        self._compiled: List[Tuple[str, str, str]] = []
+        dynamic_fields = set()
+        for message in messages:
+            kind, role, template, field_names = self._compile(message)
+            self._compiled.append((kind, role, template))
+            dynamic_fields.update(field_names)
+        # 동적 값(함수 호출)으로 평가될 수 있는 변수 이름 전체
+        self._dynamic_fields: FrozenSet[str] = frozenset(dynamic_fields)
+
+    @staticmethod
+    def _compile(message: Union[str, Tuple[str, str]]) -> Tuple[str, str, str, FrozenSet[str]]:
+        """메시지 템플릿을 한 번만 파싱해 plain/dyn으로 분류합니다."""
+        if isinstance(message, str):
+            # 기본적으로 유저 메시지로 간주 (문자열 메시지는 동적 값을 평가하지 않음)
+            return "plain", "user", message, frozenset()
+        role, template = message
+        field_names = _field_names(template)
+        # 변수를 참조하지 않는 템플릿은 동적 값을 평가할 필요가 없습니다.
+        return ("dyn" if field_names else "plain"), role, template, field_names
+
+    def _resolve_dynamic(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """(함수, 인자...) 형태의 값을 호출 결과로 바꾼 kwargs를 반환합니다. (해당 값이 없으면 kwargs 그대로)"""
+        resolved = {
+            key: kwargs[key][0](*kwargs[key][1:])
+            for key in self._dynamic_fields
+            if key in kwargs and _is_callable_tuple(kwargs[key])
+        }
+        return {**kwargs, **resolved} if resolved else kwargs
 
     def format_messages(self, user_id: str, orgn_id: str, session_id: str, max_tokens: int = 1000, **kwargs: Any) -> List[Dict[str, str]]:
         """
@@ -47,21 +93,43 @@ class ChatPromptTemplate:
             )
             formatted_messages.extend(memory_messages)
 
-        # 템플릿 메시지 처리
-        for message in self.messages:
-            if isinstance(message, str):
-                # 기본적으로 유저 메시지로 간주
-                formatted_messages.append({"role": "user", "content": message.format(**kwargs)})
-            elif isinstance(message, tuple):
-                role, template = message
-                # 함수 호출을 포함한 동적 템플릿 처리
-                content = template.format(**{
-                    key: (value(*args) if isinstance(value, tuple) and callable(value[0]) else value)
-                    for key, value in kwargs.items()
-                })
-                formatted_messages.append({"role": role, "content": content})
+        # 템플릿 메시지 처리 (동적 값은 호출당 한 번만 평가)
+        dynamic_kwargs = None
+        for kind, role, template in self._compiled:
+            if kind == "plain":
+                content = template.format_map(kwargs)
+            else:
+                if dynamic_kwargs is None:
+                    dynamic_kwargs = self._resolve_dynamic(kwargs)
+                content = template.format_map(dynamic_kwargs)
+            formatted_messages.append({"role": role, "content": content})
 
         return formatted_messages
 
+    def format_messages_with_hint(self, user_id: str, orgn_id: str, session_id: str, max_tokens: int = 1000, **kwargs: Any) -> Tuple[List[Dict[str, str]], int]:
+        """
+        format_messages 결과와 함께 응답 생성에 권장되는 max_tokens 값을 반환합니다.
 
+        Args:
+            user_id (str): 유저 ID.
+            orgn_id (str): 기관 ID.
+            session_id (str): 세션 ID.
+            max_tokens (int): 대화 내역에 포함할 최대 토큰 수. 기본값은 1000.
+            **kwargs: 템플릿 변수를 채우는 데 사용할 값들.
 
+        Returns:
+            Tuple[List[Dict[str, str]], int]: 채워진 메시지의 리스트와 권장 응답 max_tokens.
+        """
+        messages = self.format_messages(user_id, orgn_id, session_id, max_tokens=max_tokens, **kwargs)
+        return messages, self.suggest_max_tokens(messages)
+
+    @staticmethod
+    def suggest_max_tokens(messages: List[Dict[str, str]], floor: int = 512, ceiling: int = 4096) -> int:
+        """
+        마지막 유저 메시지 길이로 응답 max_tokens를 추정합니다.
+
+        응답은 질문 글자 수의 4배 정도이고 토큰 하나는 약 4글자이므로, 질문 글자 수를 그대로 토큰 수로 보고
+        floor~ceiling 범위로 제한합니다.
+        """
+        question_len = next((len(message["content"]) for message in reversed(messages) if message["role"] == "user"), 0)
+        return max(floor, min(ceiling, question_len))
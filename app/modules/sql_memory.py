@@ -1,13 +1,57 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy import create_engine, Column, Integer, String, Text, TIMESTAMP
+from sqlalchemy import create_engine, delete, insert, select, Column, Index, Integer, String, Text, TIMESTAMP
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+import asyncio
+from bisect import bisect_right
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict, Optional
+from functools import cached_property
+from itertools import accumulate
+from typing import Any, List, Dict, Iterator, Optional, Sequence, Tuple
 import os
+from app.core.config import current_config
 
 Base = declarative_base()
 
+# 로컬 LLM 사용 여부 (설정 로드 시 한 번만 결정)
+USE_LOCAL_LLM = current_config.USE_LOCAL_LLM
+
+# MySQL 등 서버형 DB 엔진의 커넥션 풀 설정
+_POOL_OPTIONS: Dict[str, Any] = {"pool_pre_ping": True, "pool_size": 20, "max_overflow": 10}
+
+# 프로세스 전체에서 공유하는 토크나이저 (SQLChatMemory.warmup 또는 첫 사용 시 로드)
+_TOKENIZER: Optional[Any] = None
+
+# aiomysql 커넥션 풀 경로(use_orm=False)에서 직접 실행하는 SQL. ChatHistory 모델과 같은 스키마입니다.
+_CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS chat_history (
+    id INTEGER NOT NULL AUTO_INCREMENT,
+    user_id VARCHAR(255) NOT NULL,
+    orgn_id VARCHAR(255) NOT NULL,
+    session_id VARCHAR(255) NOT NULL,
+    role VARCHAR(255) NOT NULL,
+    content TEXT NOT NULL,
+    timestamp TIMESTAMP NULL,
+    PRIMARY KEY (id),
+    INDEX ix_chat_history_session (user_id, orgn_id, session_id, timestamp)
+)
+"""
+_INSERT_SQL = (
+    "INSERT INTO chat_history (user_id, orgn_id, session_id, role, content, timestamp) "
+    "VALUES (%s, %s, %s, %s, %s, %s)"
+)
+_SELECT_HISTORY_SQL = (
+    "SELECT role, content FROM chat_history WHERE user_id = %s AND orgn_id = %s AND session_id = %s "
+    "ORDER BY timestamp ASC, id ASC"
+)
+_SELECT_RECENT_SQL = (
+    "SELECT role, content FROM chat_history WHERE user_id = %s AND orgn_id = %s AND session_id = %s "
+    "ORDER BY timestamp DESC, id DESC LIMIT %s"
+)
+_DELETE_SQL = "DELETE FROM chat_history WHERE user_id = %s AND orgn_id = %s AND session_id = %s"
+
 class ChatHistory(Base):
     __tablename__ = 'chat_history'
 
@@ -19,6 +63,18 @@ class ChatHistory(Base):
     content = Column(Text, nullable=False)
     timestamp = Column(TIMESTAMP, default=datetime.utcnow)
 
+    __table_args__ = (
+        # 세션별 대화 내역을 시간순으로 조회하기 위한 복합 인덱스
+        Index('ix_chat_history_session', 'user_id', 'orgn_id', 'session_id', 'timestamp'),
+    )
+
+
+def _engine_options(db_url: str) -> Dict[str, Any]:
+    """DB URL에 맞는 엔진 풀 옵션을 반환합니다. (SQLite 전용 풀은 pool_size 등을 받지 않으므로 제외)"""
+    if make_url(db_url).get_backend_name() == "sqlite":
+        return {}
+    return dict(_POOL_OPTIONS)
+
 
 class BaseMessage:
     """Base class for messages."""
@@ -36,6 +92,16 @@ class BaseMessage:
             content=self.content
         )
 
+    def to_row(self, user_id: str, orgn_id: str, session_id: str) -> Dict[str, str]:
+        """Converts the message to a row dict for a core INSERT."""
+        return {
+            "user_id": user_id,
+            "orgn_id": orgn_id,
+            "session_id": session_id,
+            "role": self.role,
+            "content": self.content
+        }
+
 
 class HumanMessage(BaseMessage):
     """Represents a message from a human user."""
@@ -55,83 +121,159 @@ class SQLChatMemory:
     """
     SQLAlchemy를 사용하여 MySQL/MariaDB에 대화 내역을 관리하는 클래스.
     동기식 및 비동기식 메서드를 모두 제공합니다.
+
+    use_orm=False이면 비동기 메서드는 SQLAlchemy 대신 aiomysql 커넥션 풀로 SQL을 직접 실행합니다.
     """
 
-    def __init__(self, db_url: Optional[str] = None, async_db_url: Optional[str] = None) -> None:
+    def __init__(self, db_url: Optional[str] = None, async_db_url: Optional[str] = None, use_orm: bool = True) -> None:
         self.sync_engine = None
         self.async_engine = None
         self.SyncSession = None
         self.AsyncSession = None
-        self.use_local_llm = os.getenv('USE_LOCAL_LLM', 'False').lower() in ['true', '1', 't']
-
-        # 토크나이저 설정
-        if self.use_local_llm:
-            from transformers import AutoTokenizer
-            self.tokenizer = AutoTokenizer.from_pretrained("meta-llama/Meta-Llama-3-8B")
-        else:
-            import tiktoken  # 토큰화 라이브러리
-            self.tokenizer = tiktoken.get_encoding("cl100k_base")  # 예: GPT-3.5/4의 기본 토크나이저 사용
+        self.use_local_llm = USE_LOCAL_LLM
+        self.use_orm = use_orm
+        self._pool = None
+        self._pool_url = None
+        self._pool_lock = asyncio.Lock()
 
         if db_url:
             self.create_sync_engine(db_url)
         if async_db_url:
-            self.create_async_engine(async_db_url)
+            if use_orm:
+                self.create_async_engine(async_db_url)
+            else:
+                self._pool_url = make_url(async_db_url)
+                if self._pool_url.get_backend_name() != "mysql":
+                    raise ValueError("use_orm=False requires a MySQL/MariaDB async_db_url.")
+
+    async def _get_pool(self) -> Any:
+        """aiomysql 커넥션 풀을 처음 사용할 때 만들고, 테이블이 없으면 생성합니다."""
+        if self._pool_url is None:
+            raise ValueError("Async engine is not initialized. Pass `async_db_url` when use_orm=False.")
+        async with self._pool_lock:
+            if self._pool is None:
+                import aiomysql
+                url = self._pool_url
+                pool = await aiomysql.create_pool(
+                    host=url.host,
+                    port=url.port or 3306,
+                    user=url.username,
+                    password=url.password or "",
+                    db=url.database,
+                    maxsize=_POOL_OPTIONS["pool_size"],
+                    autocommit=False,
+                )
+                async with pool.acquire() as conn:
+                    async with conn.cursor() as cursor:
+                        await cursor.execute(_CREATE_TABLE_SQL)
+                    await conn.commit()
+                self._pool = pool
+        return self._pool
+
+    async def _pool_execute(self, sql: str, args: Sequence[Any], many: bool = False) -> List[Tuple[Any, ...]]:
+        """풀에서 커넥션을 빌려 SQL을 실행하고 커밋합니다. (예외 시 롤백)"""
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            try:
+                async with conn.cursor() as cursor:
+                    if many:
+                        await cursor.executemany(sql, args)
+                    else:
+                        await cursor.execute(sql, args)
+                    rows = list(await cursor.fetchall()) if cursor.description else []
+                await conn.commit()
+            except Exception:
+                await conn.rollback()
+                raise
+        return rows
+
+    async def aclose(self) -> None:
+        """비동기 커넥션 풀과 엔진을 정리합니다."""
+        if self._pool is not None:
+            self._pool.close()
+            await self._pool.wait_closed()
+            self._pool = None
+        if self.async_engine is not None:
+            await self.async_engine.dispose()
+
+    @classmethod
+    def warmup(cls) -> Any:
+        """토크나이저를 미리 로드해 첫 요청의 지연을 없앱니다. 앱 시작 시 한 번 호출합니다."""
+        global _TOKENIZER
+        if _TOKENIZER is None:
+            if USE_LOCAL_LLM:
+                from transformers import AutoTokenizer
+                tokenizer = AutoTokenizer.from_pretrained("meta-llama/Meta-Llama-3-8B")
+            else:
+                import tiktoken  # 토큰화 라이브러리
+                tokenizer = tiktoken.get_encoding("cl100k_base")  # 예: GPT-3.5/4의 기본 토크나이저 사용
+            # 첫 인코딩 시 만들어지는 내부 테이블까지 미리 준비해 둡니다.
+            tokenizer.encode("warmup")
+            _TOKENIZER = tokenizer
+        return _TOKENIZER
+
+    @cached_property
+    def tokenizer(self) -> Any:
+        """프로세스 공유 토크나이저를 반환합니다. (필요하면 이때 로드)"""
+        return self.warmup()
 
     def create_sync_engine(self, db_url: str) -> None:
         """동기식 엔진을 생성합니다."""
-        self.sync_engine = create_engine(db_url)
+        self.sync_engine = create_engine(db_url, **_engine_options(db_url))
         Base.metadata.create_all(self.sync_engine)
         self.SyncSession = sessionmaker(bind=self.sync_engine)
 
     def create_async_engine(self, async_db_url: str) -> None:
         """비동기식 엔진을 생성합니다."""
-        self.async_engine = create_async_engine(async_db_url, echo=True)
+        # SQL 로그는 DEBUG 모드에서만 출력합니다.
+        self.async_engine = create_async_engine(
+            async_db_url, echo=current_config.DEBUG, **_engine_options(async_db_url)
+        )
         self.AsyncSession = sessionmaker(
             bind=self.async_engine,
             class_=AsyncSession,
             expire_on_commit=False
         )
 
-    # 동기 메서드
-    def add_message(self, message: BaseMessage, user_id: str, orgn_id: str, session_id: str) -> None:
-        """메시지를 추가합니다."""
-        if not self.SyncSession:
-            raise ValueError("Sync engine is not initialized. Call `create_sync_engine` first.")
-        session = self.SyncSession()
-        chat_history_entry = message.to_chat_history(user_id, orgn_id, session_id)
-        session.add(chat_history_entry)
-        session.commit()
-        session.close()
-
-    def add_messages(self, messages: List[BaseMessage], user_id: str, orgn_id: str, session_id: str) -> None:
-        """여러 메시지를 동기식으로 한 번에 추가합니다."""
+    @contextmanager
+    def session_scope(self) -> Iterator[Session]:
+        """동기 세션을 열고 정상 종료 시 커밋, 예외 시 롤백합니다."""
         if not self.SyncSession:
             raise ValueError("Sync engine is not initialized. Call `create_sync_engine` first.")
-
         session = self.SyncSession()
         try:
-            for message in messages:
-                chat_history_entry = message.to_chat_history(user_id, orgn_id, session_id)
-                session.add(chat_history_entry)
+            yield session
             session.commit()
-        except Exception as e:
+        except Exception:
             session.rollback()
-            raise e
+            raise
         finally:
             session.close()
 
+    # 동기 메서드
+    def add_message(self, message: BaseMessage, user_id: str, orgn_id: str, session_id: str) -> None:
+        """메시지를 추가합니다."""
+        self.add_messages([message], user_id=user_id, orgn_id=orgn_id, session_id=session_id)
+
+    def add_messages(self, messages: List[BaseMessage], user_id: str, orgn_id: str, session_id: str) -> None:
+        """여러 메시지를 동기식으로 한 번에 추가합니다."""
+        rows = [message.to_row(user_id, orgn_id, session_id) for message in messages]
+        if not rows:
+            return
+        # ORM unit of work를 거치지 않고 core INSERT 한 번으로 저장
+        with self.session_scope() as session:
+            session.execute(insert(ChatHistory), rows)
+
     def get_history(self, user_id: str, orgn_id: str, session_id: str) -> List[Dict[str, str]]:
         """대화 내역을 가져옵니다."""
         if not self.SyncSession:
             raise ValueError("Sync engine is not initialized. Call `create_sync_engine` first.")
-        session = self.SyncSession()
-        history = session.query(ChatHistory).filter_by(
-            user_id=user_id,
-            orgn_id=orgn_id,
-            session_id=session_id
-        ).order_by(ChatHistory.timestamp.asc()).all()
-        session.close()
-        return [{"role": record.role, "content": record.content} for record in history]
+        with self.SyncSession() as session:
+            # ORM 객체를 만들지 않고 role/content 행만 나눠서 읽어옵니다.
+            result = session.execute(
+                self._history_query(user_id, orgn_id, session_id).execution_options(yield_per=500)
+            )
+            return [{"role": role, "content": content} for role, content in result]
 
     def get_messages_with_token_limit(self, user_id: str, orgn_id: str, session_id: str, max_tokens: int) -> List[
         Dict[str, str]]:
@@ -140,128 +282,135 @@ class SQLChatMemory:
             raise ValueError("Sync engine is not initialized. Call `create_sync_engine` first.")
 
         session = self.SyncSession()
-        history = session.query(ChatHistory).filter_by(
-            user_id=user_id,
-            orgn_id=orgn_id,
-            session_id=session_id
-        ).order_by(ChatHistory.timestamp.asc()).all()
-        session.close()
+        try:
+            rows = session.execute(self._recent_messages_query(user_id, orgn_id, session_id, max_tokens)).all()
+        finally:
+            session.close()
 
-        total_tokens = 0
-        limited_messages = []
+        # 최신 메시지부터 토큰 한도까지 채운 뒤 다시 시간순으로 정렬
+        limited_messages = self._limit_by_tokens(rows, max_tokens)
+        limited_messages.reverse()
+        return limited_messages
 
-        for record in history:
-            content_tokens = self._count_tokens(record.content)
-            if total_tokens + content_tokens > max_tokens:
-                break
-            total_tokens += content_tokens
-            limited_messages.append({"role": record.role, "content": record.content})
+    @staticmethod
+    def _session_filter(user_id: str, orgn_id: str, session_id: str) -> Tuple[Any, ...]:
+        """세션 하나의 대화 내역을 고르는 WHERE 조건을 만듭니다."""
+        return (
+            ChatHistory.user_id == user_id,
+            ChatHistory.orgn_id == orgn_id,
+            ChatHistory.session_id == session_id
+        )
 
-        return limited_messages
+    @classmethod
+    def _history_query(cls, user_id: str, orgn_id: str, session_id: str):
+        """세션의 전체 대화 내역을 시간순으로 조회하는 쿼리를 만듭니다."""
+        return select(ChatHistory.role, ChatHistory.content).where(
+            *cls._session_filter(user_id, orgn_id, session_id)
+        ).order_by(ChatHistory.timestamp.asc(), ChatHistory.id.asc())
+
+    @classmethod
+    def _recent_messages_query(cls, user_id: str, orgn_id: str, session_id: str, max_tokens: int):
+        """토큰 한도 안에 들어갈 수 있는 최신 메시지만 조회하는 쿼리를 만듭니다."""
+        # 비어 있지 않은 메시지는 최소 1토큰이므로 최신 max_tokens개 행만 보면 충분합니다.
+        return select(ChatHistory.role, ChatHistory.content).where(
+            *cls._session_filter(user_id, orgn_id, session_id)
+        ).order_by(ChatHistory.timestamp.desc(), ChatHistory.id.desc()).limit(max_tokens)
+
+    def _limit_by_tokens(self, records: Sequence[Tuple[str, str]], max_tokens: int) -> List[Dict[str, str]]:
+        """주어진 순서대로 누적 토큰 수가 max_tokens를 넘지 않는 앞부분 메시지만 반환합니다."""
+        lengths = self._count_tokens_batch([content for _, content in records])
+        # 누적 합은 단조 증가하므로 이진 탐색으로 잘라낼 위치를 찾습니다.
+        cutoff = bisect_right(list(accumulate(lengths)), max_tokens)
+        return [{"role": role, "content": content} for role, content in records[:cutoff]]
+
+    def _count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """여러 텍스트의 토큰 수를 한 번에 계산합니다."""
+        if not texts:
+            return []
+        tokenizer = _TOKENIZER or self.warmup()
+        if self.use_local_llm:
+            if getattr(tokenizer, "is_fast", False):
+                return tokenizer(texts, add_special_tokens=False, return_length=True)["length"]
+            # 파이썬 구현 토크나이저는 배치 호출 이점이 없으므로 tokenize를 지역 변수로 묶어 반복 호출합니다.
+            tokenize = tokenizer.tokenize
+            return [len(tokenize(text)) for text in texts]
+        return [len(tokens) for tokens in tokenizer.encode_batch(texts, num_threads=os.cpu_count())]
 
     def _count_tokens(self, text: str) -> int:
         """텍스트의 토큰 수를 계산합니다."""
+        tokenizer = _TOKENIZER or self.warmup()
         if self.use_local_llm:
-            tokens = self.tokenizer.tokenize(text)
-            return len(tokens)
-        else:
-            return len(self.tokenizer.encode(text))
+            return len(tokenizer.tokenize(text))
+        return len(tokenizer.encode(text))
 
     def clear_history(self, user_id: str, orgn_id: str, session_id: str) -> None:
         """대화 내역을 삭제합니다."""
-        if not self.SyncSession:
-            raise ValueError("Sync engine is not initialized. Call `create_sync_engine` first.")
-        session = self.SyncSession()
-        session.query(ChatHistory).filter_by(
-            user_id=user_id,
-            orgn_id=orgn_id,
-            session_id=session_id
-        ).delete()
-        session.commit()
-        session.close()
+        with self.session_scope() as session:
+            session.execute(delete(ChatHistory).where(*self._session_filter(user_id, orgn_id, session_id)))
 
     # 비동기 메서드
     async def aadd_message(self, message: BaseMessage, user_id: str, orgn_id: str, session_id: str) -> None:
         """메시지를 비동기적으로 추가합니다."""
-        if not self.AsyncSession:
-            raise ValueError("Async engine is not initialized. Call `create_async_engine` first.")
-        async with self.AsyncSession() as session:
-            async with session.begin():
-                chat_history_entry = message.to_chat_history(user_id, orgn_id, session_id)
-                session.add(chat_history_entry)
-                await session.commit()
+        await self.aadd_messages([message], user_id=user_id, orgn_id=orgn_id, session_id=session_id)
 
     async def aadd_messages(self, messages: List[BaseMessage], user_id: str, orgn_id: str, session_id: str) -> None:
         """여러 메시지를 비동기식으로 한 번에 추가합니다."""
+        if not self.use_orm:
+            if messages:
+                timestamp = datetime.utcnow()
+                await self._pool_execute(_INSERT_SQL, [
+                    (user_id, orgn_id, session_id, message.role, message.content, timestamp) for message in messages
+                ], many=True)
+            return
         if not self.AsyncSession:
             raise ValueError("Async engine is not initialized. Call `create_async_engine` first.")
 
+        rows = [message.to_row(user_id, orgn_id, session_id) for message in messages]
+        if not rows:
+            return
+        # session.begin()이 정상 종료 시 커밋, 예외 시 롤백합니다.
         async with self.AsyncSession() as session:
-            try:
-                async with session.begin():
-                    for message in messages:
-                        chat_history_entry = message.to_chat_history(user_id, orgn_id, session_id)
-                        session.add(chat_history_entry)
-                    await session.commit()
-            except Exception as e:
-                await session.rollback()
-                raise e
+            async with session.begin():
+                await session.execute(insert(ChatHistory), rows)
 
     async def aget_history(self, user_id: str, orgn_id: str, session_id: str) -> List[Dict[str, str]]:
         """대화 내역을 비동기적으로 가져옵니다."""
+        if not self.use_orm:
+            rows = await self._pool_execute(_SELECT_HISTORY_SQL, (user_id, orgn_id, session_id))
+            return [{"role": role, "content": content} for role, content in rows]
         if not self.AsyncSession:
             raise ValueError("Async engine is not initialized. Call `create_async_engine` first.")
         async with self.AsyncSession() as session:
-            result = await session.execute(
-                session.query(ChatHistory).filter_by(
-                    user_id=user_id,
-                    orgn_id=orgn_id,
-                    session_id=session_id
-                ).order_by(ChatHistory.timestamp.asc())
-            )
-            history = result.scalars().all()
-            return [{"role": record.role, "content": record.content} for record in history]
+            result = await session.execute(self._history_query(user_id, orgn_id, session_id))
+            return [{"role": role, "content": content} for role, content in result]
 
     async def aget_messages_with_token_limit(self, user_id: str, orgn_id: str, session_id: str, max_tokens: int) -> \
     List[Dict[str, str]]:
         """지정된 토큰 수 이내의 대화 내역을 비동기적으로 가져옵니다."""
-        if not self.AsyncSession:
-            raise ValueError("Async engine is not initialized. Call `create_async_engine` first.")
-
-        async with self.AsyncSession() as session:
-            result = await session.execute(
-                session.query(ChatHistory).filter_by(
-                    user_id=user_id,
-                    orgn_id=orgn_id,
-                    session_id=session_id
-                ).order_by(ChatHistory.timestamp.asc())
-            )
-            history = result.scalars().all()
-
-        total_tokens = 0
-        limited_messages = []
+        if not self.use_orm:
+            rows = await self._pool_execute(_SELECT_RECENT_SQL, (user_id, orgn_id, session_id, max_tokens))
+        else:
+            if not self.AsyncSession:
+                raise ValueError("Async engine is not initialized. Call `create_async_engine` first.")
 
-        for record in history:
-            content_tokens = self._count_tokens(record.content)
-            if total_tokens + content_tokens > max_tokens:
-                break
-            total_tokens += content_tokens
-            limited_messages.append({"role": record.role, "content": record.content})
+            async with self.AsyncSession() as session:
+                result = await session.execute(self._recent_messages_query(user_id, orgn_id, session_id, max_tokens))
+                rows = result.all()
 
+        # 최신 메시지부터 토큰 한도까지 채운 뒤 다시 시간순으로 정렬
+        limited_messages = self._limit_by_tokens(rows, max_tokens)
+        limited_messages.reverse()
         return limited_messages
 
     async def aclear_history(self, user_id: str, orgn_id: str, session_id: str) -> None:
         """대화 내역을 비동기적으로 삭제합니다."""
+        if not self.use_orm:
+            await self._pool_execute(_DELETE_SQL, (user_id, orgn_id, session_id))
+            return
         if not self.AsyncSession:
             raise ValueError("Async engine is not initialized. Call `create_async_engine` first.")
         async with self.AsyncSession() as session:
-            await session.execute(
-                session.query(ChatHistory).filter_by(
-                    user_id=user_id,
-                    orgn_id=orgn_id,
-                    session_id=session_id
-                ).delete()
-            )
+            await session.execute(delete(ChatHistory).where(*self._session_filter(user_id, orgn_id, session_id)))
             await session.commit()
 
 